@@ -1,4 +1,5 @@
 import os
+import select
 
 from .screen import Screen
 from .defs import KEYMAP as _KEYMAP
@@ -10,12 +11,101 @@ ACTION_CANCEL = 1001
 ACTION_NEXT = 1002
 ACTION_PREV = 1003
 
+
+def _key_len(buf):
+    """Returns the number of bytes the first key in a non-empty input buffer occupies.
+
+    Escape sequences (CSI, SS3 and X10 mouse reports) and UTF-8 encoded characters are kept
+    together; anything else is a single byte. If the key is cut off at the end of `buf`, the
+    result is larger than `len(buf)`.
+    """
+    c = buf[0]
+    if c == 0x1b:
+        if len(buf) == 1:
+            return 1
+        if buf[1] == 0x5b:  # "["
+            # X10 mouse report: "\x1b[M" followed by button, column and row bytes
+            if buf[2:3] == b"M":
+                return 6
+            # Parameters and intermediates, then one final byte in the range "@" to "~"
+            for i in range(2, len(buf)):
+                if 0x40 <= buf[i] <= 0x7e:
+                    return i + 1
+            return len(buf) + 1
+        if buf[1] == 0x4f:  # "O"
+            return 3
+        # Alt+key
+        return 2
+    if c >= 0xf0:
+        return 4
+    if c >= 0xe0:
+        return 3
+    if c >= 0xc0:
+        return 2
+    return 1
+
+
+# Marks the X10 mouse report prefix in `_KEY_TRIE`
+_MOUSE = object()
+
+
+def _build_key_trie(keymap):
+    """Builds a byte trie from a mapping of byte sequences to keys.
+
+    Each node is a dict from byte values to child nodes; a node where a sequence ends also maps
+    None to the key of that sequence.
+    """
+    trie = {}
+    for seq, key in keymap.items():
+        node = trie
+        for c in seq:
+            node = node.setdefault(c, {})
+        node[None] = key
+    return trie
+
+
+_KEY_TRIE = _build_key_trie({**_KEYMAP, b"\x1b[M": _MOUSE})
+
+
+def _match_key(buf):
+    """Matches the first key in a non-empty input buffer.
+
+    Returns
+    -------
+    key : a list, str, or byte
+        The same as what `Widget.get_input` returns.
+    consumed : int
+        The number of bytes of `buf` the key occupies.
+    """
+    node = _KEY_TRIE
+    key = None
+    consumed = 0
+    for i in range(len(buf)):
+        node = node.get(buf[i])
+        if node is None:
+            break
+        if None in node:
+            key = node[None]
+            consumed = i + 1
+
+    if key is _MOUSE:
+        if len(buf) >= consumed + 3:
+            return [buf[consumed + 1] - 33, buf[consumed + 2] - 33], consumed + 3
+    elif key is not None and (consumed > 1 or buf[0] != 0x1b or len(buf) == 1):
+        return key, consumed
+
+    # Unknown sequence, or a lone ESC matched at the start of a longer one
+    consumed = _key_len(buf)
+    key = bytes(buf[:consumed])
+    return _KEYMAP.get(key, key), consumed
+
+
 class Widget(Screen):
     """The base class for all widgets.
 
     Attributes
     ----------
-    kbuf : bytes
+    kbuf : bytearray
         Used as a buffer space to store input bytes.
     signals : list of functions
         This variable stores the callback functions for different signals. Callback functions can
@@ -38,7 +128,7 @@ class Widget(Screen):
 
     def __init__(self):
         # constructor's docstring is should be handled by the class' docstring
-        self.kbuf = b""
+        self.kbuf = bytearray()
         self.signals = {}
 
     def set_xy(self, x, y):
@@ -81,8 +171,9 @@ class Widget(Screen):
         KeyError
             If the callback of the given signal has not been set through the `on` method.
         """
-        if sig in self.signals:
-            self.signals[sig](self)
+        handler = self.signals.get(sig)
+        if handler:
+            handler(self)
 
     def on(self, sig, handler):
         """Registers the callback function of a signal.
@@ -105,9 +196,7 @@ class Widget(Screen):
         items : list-like
             A list of objects that have `__len__` member function.
         """
-        if not items:
-            return 0
-        return max((len(t) for t in items))
+        return max(map(len, items), default=0)
 
     def set_cursor(self):
         """Disables the cursor."""
@@ -128,22 +217,16 @@ class Widget(Screen):
             If the input key is not found in `KEYMAP`, then returns the original byte representation
             of the key.
         """
-        if self.kbuf:
-            key = self.kbuf[0:1]
-            self.kbuf = self.kbuf[1:]
-        else:
-            key = os.read(0, 32)
-            if key[0] != 0x1b:
-                key = key.decode()
-                self.kbuf = key[1:].encode()
-                key = key[0:1].encode()
-        key = _KEYMAP.get(key, key)
-
-        if isinstance(key, bytes) and key.startswith(b"\x1b[M") and len(key) == 6:
-            row = key[5] - 33
-            col = key[4] - 33
-            return [col, row]
-
+        # Make sure everything drawn so far is visible before waiting for the user
+        self.flush()
+        if not self.kbuf:
+            # Everything already typed or pasted arrives with a single read
+            self.kbuf += os.read(0, 256)
+        # A key cut off by the end of a read: its remaining bytes follow right away
+        while _key_len(self.kbuf) > len(self.kbuf) and select.select([0], [], [], 0.1)[0]:
+            self.kbuf += os.read(0, 256)
+        key, n = _match_key(self.kbuf)
+        del self.kbuf[:n]
         return key
 
     def handle_input(self, inp):
@@ -160,11 +243,10 @@ class Widget(Screen):
         res
             The return depends on how derived classes define `handle_mouse` and `handle_key`.
         """
-        if isinstance(inp, list):
-            res = self.handle_mouse(inp[0], inp[1])
-        else:
-            res = self.handle_key(inp)
-        return res
+        # Mouse reports are always plain lists, see `get_input`
+        if type(inp) is list:
+            return self.handle_mouse(inp[0], inp[1])
+        return self.handle_key(inp)
 
     def loop(self):
         """A loop to obtain inputs and reacts until obtaining desired signal.
@@ -173,10 +255,22 @@ class Widget(Screen):
         of these callbacks are not None and not True, the loop stops and return the returns of these
         callbacks.
         """
-        self.redraw()
+        self.begin_batch()
+        try:
+            self.redraw()
+        finally:
+            self.end_batch()
+        get_input = self.get_input
+        handle_input = self.handle_input
+        begin_batch = self.begin_batch
+        end_batch = self.end_batch
         while True:
-            key = self.get_input()
-            res = self.handle_input(key)
+            key = get_input()
+            begin_batch()
+            try:
+                res = handle_input(key)
+            finally:
+                end_batch()
 
             if res is not None and res is not True:
                 return res
@@ -151,7 +151,7 @@ class EditorExt(Editor):
     def show_cursor_status(self):
         self.cursor(False)
         self.goto(0, 31)
-        self.wr("% 3d:% 3d" % (self.cur_line, self.col + self.margin))
+        self.wr_b(b"% 3d:% 3d" % (self.cur_line, self.col + self.margin))
         self.set_cursor()
         self.cursor(True)
 
@@ -1,5 +1,82 @@
+import functools
 import os
+import select
 import signal
+import time
+try:
+    import termios
+    import tty
+except ImportError:
+    # Not a POSIX system, init_tty/deinit_tty are unavailable
+    termios = tty = None
+
+
+# Pending output of the current batch, see `Screen.begin_batch`
+_buf = bytearray()
+# Nesting depth of `Screen.begin_batch`/`Screen.end_batch` calls
+_batch_depth = 0
+# Flush the batch buffer early once it grows past this many bytes
+_BUF_SIZE = 8192
+# Set while `Screen.flush` is writing, so that a flush from a signal handler leaves it alone
+_flushing = False
+
+
+# Control Sequence Introducer
+_CSI = b"\x1b["
+
+
+# Beginnings of the cursor-positioning control sequences, indexed by line
+_ROW_PREFIX = [_CSI + b"%d;" % (y + 1) for y in range(256)]
+
+
+@functools.lru_cache(maxsize=4096)
+def _goto_bytes(x, y):
+    """Returns the control sequence that moves the cursor to column `x` and line `y`."""
+    if 0 <= y < len(_ROW_PREFIX):
+        return _ROW_PREFIX[y] + b"%dH" % (x + 1)
+    return _CSI + b"%d;%dH" % (y + 1, x + 1)
+
+
+@functools.lru_cache(maxsize=256)
+def _encode_title(title):
+    """Returns a dialog box title (str or bytes) encoded in UTF-8, and its length in characters."""
+    if isinstance(title, str):
+        return title.encode("utf-8"), len(title)
+    return title, len(str(title, "utf-8"))
+
+
+@functools.lru_cache(maxsize=64)
+def _hline(width):
+    """Returns a horizontal box-drawing line ("─") of the given width, encoded in UTF-8."""
+    return b"\xe2\x94\x80" * width
+
+
+@functools.lru_cache(maxsize=64)
+def _blanks(width):
+    """Returns a string of spaces of the given width as bytes."""
+    return b" " * width
+
+
+def _color_seq(fg, bg):
+    """Returns the control sequence that sets the colors, see `Screen.attr_color`."""
+    if bg is None:
+        if (fg > 8):
+            return _CSI + b"%d;1m" % (fg + 30 - 8)
+        return _CSI + b"%dm" % (fg + 30)
+    assert bg <= 8
+    if (fg > 8):
+        return _CSI + b"%d;%d;1m" % (fg + 30 - 8, bg + 40)
+    return _CSI + b"0;%d;%dm" % (fg + 30, bg + 40)
+
+
+# "Erase Character" control sequences for the common counts, indexed by count
+_CLEAR_NUM = [_CSI + b"%dX" % num for num in range(256)]
+
+
+# Color control sequences for all the regular and bold colors on all the backgrounds
+_COLOR_SEQS = {
+    (fg, bg): _color_seq(fg, bg) for fg in range(16) for bg in list(range(9)) + [None]
+}
 
 
 class Screen:
@@ -16,25 +93,85 @@ class Screen:
         The terminal attributes at the time when the `init_tty` is called.
     screen_redraw : callable object
         The function that redraws things on the screen. It is set through `set_screen_redraw`.
+    _cached_size : tuple of two ints or None
+        The result of the last `screen_size` query. It is reset by `init_tty` and whenever a
+        SIGWINCH signal arrives after `set_screen_resize` was called.
 
     References
     ----------
     [1] XTerm Control Sequences, URL: https://invisible-island.net/xterm/ctlseqs/ctlseqs.pdf
     """
 
+    _cached_size = None
+
     @staticmethod
     def wr(s):
         """Writes bytes or a string to the current terminal screen.
 
+        Inside a batch (see `begin_batch`), the output is accumulated in a buffer instead of being
+        written immediately.
+
         Parameters
         ----------
             s : str
                 The byte/string to be output.
         """
-        # TODO: When Python is 3.5, update this to use only bytes
         if isinstance(s, str):
             s = bytes(s, "utf-8")
-        os.write(1, s)
+        Screen.wr_b(s)
+
+    @staticmethod
+    def wr_b(b):
+        """Writes bytes to the current terminal screen.
+
+        Same as `wr`, but only accepts bytes-like objects.
+
+        Parameters
+        ----------
+            b : bytes
+                The bytes to be output.
+        """
+        if _batch_depth:
+            _buf.extend(b)
+            if len(_buf) >= _BUF_SIZE:
+                Screen.flush()
+        else:
+            os.write(1, b)
+
+    @staticmethod
+    def flush():
+        """Writes out all the output accumulated in the batch buffer."""
+        global _flushing
+        # A signal handler interrupted a flush in progress; whatever it appended to the buffer is
+        # written out by the interrupted flush.
+        if _flushing:
+            return
+        _flushing = True
+        try:
+            # os.write() may write only part of a large buffer
+            while _buf:
+                n = os.write(1, _buf)
+                del _buf[:n]
+        finally:
+            _flushing = False
+
+    @staticmethod
+    def begin_batch():
+        """Starts accumulating the output of `wr` instead of writing it immediately.
+
+        Batches can be nested; the accumulated output is written out by the outermost `end_batch`,
+        or earlier when the buffer grows too large or `flush` is called explicitly.
+        """
+        global _batch_depth
+        _batch_depth += 1
+
+    @staticmethod
+    def end_batch():
+        """Ends a batch started with `begin_batch`; the outermost one writes out the output."""
+        global _batch_depth
+        _batch_depth -= 1
+        if not _batch_depth:
+            Screen.flush()
 
     @staticmethod
     def wr_fixedw(s, width):
@@ -47,17 +184,13 @@ class Screen:
             width : int
                 The width.
         """
-        # TODO: can be simply handled with Python 3's string formatting capability.
-        s = s[:width]
-        Screen.wr(s)
-        Screen.wr(" " * (width - len(s)))
-        # Doesn't work here, as it doesn't advance cursor
-        #Screen.clear_num_pos(width - len(s))
+        # Pad with spaces rather than clear_num_pos(), as the latter doesn't advance the cursor
+        Screen.wr(s[:width].ljust(width))
 
     @staticmethod
     def cls():
         """Clears the entire screen."""
-        Screen.wr(b"\x1b[2J")
+        Screen.wr_b(b"\x1b[2J")
 
     @staticmethod
     def goto(x, y):
@@ -70,13 +203,12 @@ class Screen:
             y : int
                 The line where the cursor will be.
         """
-        # TODO: When Python is 3.5, update this to use bytes
-        Screen.wr("\x1b[%d;%dH" % (y + 1, x + 1))
+        Screen.wr_b(_goto_bytes(x, y))
 
     @staticmethod
     def clear_to_eol():
         """Clears from the current cursor position to the end of line."""
-        Screen.wr(b"\x1b[0K")
+        Screen.wr_b(b"\x1b[0K")
 
     # Clear specified number of positions
     @staticmethod
@@ -89,7 +221,10 @@ class Screen:
             Number of characters to be cleared on the right of the cursor.
         """
         if num > 0:
-            Screen.wr("\x1b[%dX" % num)
+            if num < len(_CLEAR_NUM):
+                Screen.wr_b(_CLEAR_NUM[num])
+            else:
+                Screen.wr_b(_CSI + b"%dX" % num)
 
     @staticmethod
     def attr_color(fg, bg=-1):
@@ -119,23 +254,15 @@ class Screen:
         if bg == -1:
             bg = fg >> 4
             fg &= 0xf
-        # TODO: Switch to b"%d" % foo when py3.5 is everywhere
-        if bg is None:
-            if (fg > 8):
-                Screen.wr("\x1b[%d;1m" % (fg + 30 - 8))
-            else:
-                Screen.wr("\x1b[%dm" % (fg + 30))
-        else:
-            assert bg <= 8
-            if (fg > 8):
-                Screen.wr("\x1b[%d;%d;1m" % (fg + 30 - 8, bg + 40))
-            else:
-                Screen.wr("\x1b[0;%d;%dm" % (fg + 30, bg + 40))
+        seq = _COLOR_SEQS.get((fg, bg))
+        if seq is None:
+            seq = _color_seq(fg, bg)
+        Screen.wr_b(seq)
 
     @staticmethod
     def attr_reset():
         """Resets the foreground and background colors of the future outputs on the screen."""
-        Screen.wr(b"\x1b[0m")
+        Screen.wr_b(b"\x1b[0m")
 
     @staticmethod
     def cursor(onoff):
@@ -147,9 +274,9 @@ class Screen:
             Whether to show the cursor or not.
         """
         if onoff:
-            Screen.wr(b"\x1b[?25h")
+            Screen.wr_b(b"\x1b[?25h")
         else:
-            Screen.wr(b"\x1b[?25l")
+            Screen.wr_b(b"\x1b[?25l")
 
     def draw_box(self, left, top, width, height):
         """Draws the border lines of a box on the screen.
@@ -168,30 +295,26 @@ class Screen:
         # Use http://www.utf8-chartable.de/unicode-utf8-table.pl
         # for utf-8 pseudographic reference
         bottom = top + height - 1
-        self.goto(left, top)
-        # "┌"
-        self.wr(b"\xe2\x94\x8c")
         # "─"
-        hor = b"\xe2\x94\x80" * (width - 2)
-        self.wr(hor)
-        # "┐"
-        self.wr(b"\xe2\x94\x90")
-
-        self.goto(left, bottom)
-        # "└"
-        self.wr(b"\xe2\x94\x94")
-        self.wr(hor)
-        # "┘"
-        self.wr(b"\xe2\x94\x98")
-
+        hor = _hline(width - 2)
+        parts = [
+            # "┌" ... "┐"
+            _goto_bytes(left, top), b"\xe2\x94\x8c", hor, b"\xe2\x94\x90",
+            # "└" ... "┘"
+            _goto_bytes(left, bottom), b"\xe2\x94\x94", hor, b"\xe2\x94\x98",
+        ]
+        # "│" on both sides, skipping the interior with a relative cursor move. Note that a
+        # "Cursor Forward" by 0 columns would still move by 1.
+        sides = b"\xe2\x94\x82"
+        if width > 2:
+            sides += _CSI + b"%dC" % (width - 2)
+        sides += b"\xe2\x94\x82"
         top += 1
         while top < bottom:
-            # "│"
-            self.goto(left, top)
-            self.wr(b"\xe2\x94\x82")
-            self.goto(left + width - 1, top)
-            self.wr(b"\xe2\x94\x82")
+            parts.append(_goto_bytes(left, top))
+            parts.append(sides)
             top += 1
+        self.wr_b(b"".join(parts))
 
     def clear_box(self, left, top, width, height):
         """Clears the border lines of a box defined at a given location and size.
@@ -209,12 +332,14 @@ class Screen:
         """
         # doesn't work
         #self.wr("\x1b[%s;%s;%s;%s$z" % (top + 1, left + 1, top + height, left + width))
-        s = b" " * width
+        s = _blanks(width)
+        parts = []
         bottom = top + height
         while top < bottom:
-            self.goto(left, top)
-            self.wr(s)
+            parts.append(_goto_bytes(left, top))
+            parts.append(s)
             top += 1
+        self.wr_b(b"".join(parts))
 
     def dialog_box(self, left, top, width, height, title=""):
         """A dialog box that can have a title.
@@ -231,28 +356,60 @@ class Screen:
             The total columns the box spans.
         height : integer
             The total lines the box spans.
-        title : str
-            The title. Default: "".
+        title : str or bytes
+            The title; bytes are taken as UTF-8. Default: "".
         """
-        self.clear_box(left + 1, top + 1, width - 2, height - 2)
-        self.draw_box(left, top, width, height)
+        self.wr_b(self._render_dialog(left, top, width, height, title))
+
+    @staticmethod
+    def _render_dialog(left, top, width, height, title):
+        """Returns the bytes that draw a dialog box, see `dialog_box`.
+
+        This is the same as `clear_box` of the interior followed by `draw_box` and the title, but
+        every line of the box is emitted only once.
+        """
+        hor_w = width - 2
+        bottom = top + height - 1
+        # "┌"
+        parts = [_goto_bytes(left, top), b"\xe2\x94\x8c"]
         if title:
-            #pos = (width - len(title)) / 2
-            pos = 1
-            self.goto(left + pos, top)
-            self.wr(title)
+            # The title starts right after the corner, in place of the border line
+            if isinstance(title, bytearray):
+                title = bytes(title)
+            title, title_len = _encode_title(title)
+            parts.append(title)
+            hor_w -= title_len
+        if hor_w >= 0:
+            # "─" ... "┐"
+            parts.append(_hline(hor_w))
+            parts.append(b"\xe2\x94\x90")
+
+        # "│" on both sides of a blank line
+        row = b"\xe2\x94\x82" + _blanks(width - 2) + b"\xe2\x94\x82"
+        y = top + 1
+        while y < bottom:
+            parts.append(_goto_bytes(left, y))
+            parts.append(row)
+            y += 1
+
+        # "└" ... "┘"
+        parts.append(_goto_bytes(left, bottom))
+        parts.append(b"\xe2\x94\x94")
+        parts.append(_hline(width - 2))
+        parts.append(b"\xe2\x94\x98")
+        return b"".join(parts)
 
     @classmethod
     def init_tty(cls):
         """Gets the attributes of the current terminal and set the terminal to raw mode."""
-        import tty, termios
+        Screen._cached_size = None
         cls.org_termios = termios.tcgetattr(0)
         tty.setraw(0)
 
     @classmethod
     def deinit_tty(cls):
         """Recovers the terminal attributes back to what they were the last time init_tty was called."""
-        import termios
+        cls.flush()
         termios.tcsetattr(0, termios.TCSANOW, cls.org_termios)
 
     @classmethod
@@ -263,13 +420,13 @@ class Screen:
         press, encoding the location and the mouse button pressed.
         """
         # Mouse reporting - X10 compatibility mode
-        cls.wr(b"\x1b[?9h")
+        cls.wr_b(b"\x1b[?9h")
 
     @classmethod
     def disable_mouse(cls):
         """Disables mouse tracking."""
         # Mouse reporting - X10 compatibility mode
-        cls.wr(b"\x1b[?9l")
+        cls.wr_b(b"\x1b[?9l")
 
     @classmethod
     def screen_size(cls):
@@ -281,16 +438,31 @@ class Screen:
             The number of columns of the current screen.
         height : int
             The number of lines of the current screen.
+
+        Note
+        ----
+        Once the terminal has answered, later calls return the cached result until the screen is
+        resized (see `set_screen_resize`). If it doesn't answer in time, 80x24 is returned without
+        being cached.
         """
-        import select
-        cls.wr(b"\x1b[18t")
-        res = select.select([0], [], [], 0.2)[0]
-        if not res:
-            return (80, 24)
-        resp = os.read(0, 32)
+        if Screen._cached_size is not None:
+            return Screen._cached_size
+        cls.wr_b(b"\x1b[18t")
+        cls.flush()
+        # The reply may arrive in pieces; give up on it after 200 ms in total
+        resp = b""
+        deadline = time.monotonic() + 0.2
+        while resp[-1:] != b"t":
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                # Not cached, so that the next call asks the terminal again
+                return (80, 24)
+            if select.select([0], [], [], remaining)[0]:
+                resp += os.read(0, 32)
         assert resp.startswith(b"\x1b[8;") and resp[-1:] == b"t"
         vals = resp[:-1].split(b";")
-        return (int(vals[2]), int(vals[1]))
+        Screen._cached_size = (int(vals[2]), int(vals[1]))
+        return Screen._cached_size
 
     # Set function to redraw an entire (client) screen
     # This is called to restore original screen, as we don't save it.
@@ -306,6 +478,20 @@ class Screen:
         Note
         ----
         The signal SIGWINCH is sent to a terminal application when the size of the terminal window
-        changes.
+        changes. The size cached by `screen_size` is discarded before `handler` is called, so the
+        handler gets the new size from `screen_size`.
         """
-        signal.signal(signal.SIGWINCH, lambda sig, stk: handler(cls))
+        def on_resize(sig, stk):
+            Screen._cached_size = None
+            # Queue the redraw after any output still pending, so it is not interleaved with
+            # the rest of an interrupted frame
+            Screen.begin_batch()
+            try:
+                handler(cls)
+            finally:
+                Screen.end_batch()
+            # A nested loop may be waiting for input inside a batch, so don't leave the redraw
+            # sitting in the buffer until the next key press
+            Screen.flush()
+
+        signal.signal(signal.SIGWINCH, on_resize)
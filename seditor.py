@@ -60,8 +60,7 @@ class Editor:
 
     @staticmethod
     def goto(row, col):
-        # TODO: When Python is 3.5, update this to use bytes
-        Editor.wr("\x1b[%d;%dH" % (row + 1, col + 1))
+        Editor.wr(b"\x1b[%d;%dH" % (row + 1, col + 1))
 
     @staticmethod
     def clear_to_eol():
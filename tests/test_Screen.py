@@ -0,0 +1,183 @@
+import os
+import unittest
+from unittest import mock
+from picotui.screen import Screen
+
+
+class Output:
+    """Captures everything written to file descriptor 1."""
+
+    def __enter__(self):
+        self.r, w = os.pipe()
+        self.saved = os.dup(1)
+        os.dup2(w, 1)
+        os.close(w)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        os.dup2(self.saved, 1)
+        os.close(self.saved)
+        os.close(self.r)
+
+    def read(self):
+        os.set_blocking(self.r, False)
+        try:
+            return os.read(self.r, 65536)
+        except BlockingIOError:
+            return b""
+
+
+class ScreenTest(unittest.TestCase):
+    def test_batch_defers_output(self):
+        with Output() as out:
+            Screen.begin_batch()
+            Screen.wr("abc")
+            Screen.wr(b"def")
+            self.assertEqual(out.read(), b"")
+            Screen.end_batch()
+            self.assertEqual(out.read(), b"abcdef")
+
+    def test_nested_batch_flushes_at_outermost_end(self):
+        with Output() as out:
+            Screen.begin_batch()
+            Screen.begin_batch()
+            Screen.wr(b"x")
+            Screen.end_batch()
+            self.assertEqual(out.read(), b"")
+            Screen.end_batch()
+            self.assertEqual(out.read(), b"x")
+
+    def test_flush_retries_short_writes(self):
+        written = []
+
+        def short_write(fd, data):
+            written.append(bytes(data[:3]))
+            return len(written[-1])
+
+        Screen.begin_batch()
+        Screen.wr(b"abcdefgh")
+        with mock.patch("picotui.screen.os.write", short_write):
+            Screen.end_batch()
+        self.assertEqual(written, [b"abc", b"def", b"gh"])
+
+    def test_resize_during_short_write(self):
+        written = []
+
+        def handler(screen):
+            Screen.wr(b"R")
+
+        with mock.patch("picotui.screen.signal.signal") as set_signal:
+            Screen.set_screen_resize(handler)
+        on_resize = set_signal.call_args[0][1]
+
+        def short_write(fd, data):
+            written.append(bytes(data[:3]))
+            if len(written) == 1:
+                # SIGWINCH arrives before the interrupted flush removes the written bytes
+                on_resize(None, None)
+            return len(written[-1])
+
+        Screen.begin_batch()
+        Screen.wr(b"abcdefgh")
+        with mock.patch("picotui.screen.os.write", short_write):
+            Screen.end_batch()
+        self.assertEqual(b"".join(written), b"abcdefghR")
+
+    def test_draw_box(self):
+        with Output() as out:
+            Screen().draw_box(0, 0, 3, 3)
+            self.assertEqual(
+                out.read(),
+                b"\x1b[1;1H\xe2\x94\x8c\xe2\x94\x80\xe2\x94\x90"
+                b"\x1b[3;1H\xe2\x94\x94\xe2\x94\x80\xe2\x94\x98"
+                b"\x1b[2;1H\xe2\x94\x82\x1b[1C\xe2\x94\x82"
+            )
+
+    def test_clear_box(self):
+        with Output() as out:
+            Screen().clear_box(2, 1, 2, 2)
+            self.assertEqual(out.read(), b"\x1b[2;3H  \x1b[3;3H  ")
+
+    def test_attr_color(self):
+        with Output() as out:
+            Screen.attr_color(7, 4)
+            Screen.attr_color(15, None)
+            Screen.attr_color(0x47)
+            self.assertEqual(out.read(), b"\x1b[0;37;44m\x1b[37;1m\x1b[0;37;44m")
+
+    def test_clear_num_pos(self):
+        with Output() as out:
+            Screen.clear_num_pos(0)
+            Screen.clear_num_pos(5)
+            Screen.clear_num_pos(300)
+            self.assertEqual(out.read(), b"\x1b[5X\x1b[300X")
+
+    def test_wr_fixedw(self):
+        with Output() as out:
+            Screen.wr_fixedw("abc", 5)
+            Screen.wr_fixedw("abcdef", 4)
+            self.assertEqual(out.read(), b"abc  abcd")
+
+    def test_dialog_box(self):
+        with Output() as out:
+            Screen().dialog_box(0, 0, 5, 3, "ab")
+            self.assertEqual(
+                out.read(),
+                b"\x1b[1;1H\xe2\x94\x8cab\xe2\x94\x80\xe2\x94\x90"
+                b"\x1b[2;1H\xe2\x94\x82   \xe2\x94\x82"
+                b"\x1b[3;1H\xe2\x94\x94\xe2\x94\x80\xe2\x94\x80\xe2\x94\x80\xe2\x94\x98"
+            )
+
+    def test_dialog_box_bytes_title(self):
+        with Output() as out:
+            Screen().dialog_box(0, 0, 5, 3, "\xe9b")
+            expected = out.read()
+            Screen().dialog_box(0, 0, 5, 3, "\xe9b".encode())
+            self.assertEqual(out.read(), expected)
+
+
+class ScreenSizeTest(unittest.TestCase):
+    def setUp(self):
+        Screen._cached_size = None
+
+    def tearDown(self):
+        Screen._cached_size = None
+
+    def screen_size(self, replies):
+        """Calls `Screen.screen_size` with the terminal's reply split into `replies`."""
+        with Output(), \
+                mock.patch("picotui.screen.select.select", return_value=([0], [], [])), \
+                mock.patch("picotui.screen.os.read", side_effect=replies) as read:
+            size = Screen.screen_size()
+        return size, read.call_count
+
+    def test_screen_size_is_cached(self):
+        self.assertEqual(self.screen_size([b"\x1b[8;30;100t"]), ((100, 30), 1))
+        self.assertEqual(self.screen_size([]), ((100, 30), 0))
+
+    def test_init_tty_resets_cached_size(self):
+        self.screen_size([b"\x1b[8;30;100t"])
+        with mock.patch("picotui.screen.termios"), mock.patch("picotui.screen.tty"):
+            Screen.init_tty()
+        self.assertEqual(self.screen_size([b"\x1b[8;40;120t"]), ((120, 40), 1))
+
+    def test_resize_resets_cached_size(self):
+        sizes = []
+        with mock.patch("picotui.screen.signal.signal") as set_signal:
+            Screen.set_screen_resize(lambda screen: sizes.append(Screen._cached_size))
+        on_resize = set_signal.call_args[0][1]
+        self.screen_size([b"\x1b[8;30;100t"])
+        on_resize(None, None)
+        self.assertEqual(sizes, [None])
+        self.assertEqual(self.screen_size([b"\x1b[8;40;120t"]), ((120, 40), 1))
+
+    def test_screen_size_reply_in_pieces(self):
+        self.assertEqual(self.screen_size([b"\x1b[8;30;", b"100t"]), ((100, 30), 2))
+
+    def test_screen_size_fallback_is_not_cached(self):
+        with Output(), \
+                mock.patch("picotui.screen.select.select", return_value=([], [], [])), \
+                mock.patch("picotui.screen.time.monotonic", side_effect=[0, 0.1, 0.3]):
+            self.assertEqual(Screen.screen_size(), (80, 24))
+        self.assertIsNone(Screen._cached_size)
+        self.assertEqual(self.screen_size([b"\x1b[8;30;100t"]), ((100, 30), 1))
@@ -0,0 +1,70 @@
+import unittest
+from unittest import mock
+from picotui.basewidget import Widget
+from picotui.widgets import WLabel
+from picotui.defs import KEY_UP, KEY_ESC, KEY_ENTER, KEY_F5, KEY_HOME
+
+
+class WidgetTest(unittest.TestCase):
+    def get_inputs(self, buf):
+        widget = Widget()
+        widget.kbuf = bytearray(buf)
+        inputs = []
+        while widget.kbuf:
+            inputs.append(widget.get_input())
+        return inputs
+
+    def test_get_input_splits_buffered_keys(self):
+        self.assertEqual(
+            self.get_inputs(b"a\x1b[A\xc3\xa9\x1b[15~\r"),
+            [b"a", KEY_UP, "é".encode(), KEY_F5, KEY_ENTER]
+        )
+
+    def test_get_input_mouse(self):
+        self.assertEqual(self.get_inputs(b"\x1b[M !#x"), [[0, 2], b"x"])
+
+    def test_get_input_esc(self):
+        self.assertEqual(self.get_inputs(b"\x1b"), [KEY_ESC])
+
+    def test_get_input_unmapped_escape_sequences(self):
+        self.assertEqual(
+            self.get_inputs(b"\x1b[1;5A\x1bx\x1b[1~"), [b"\x1b[1;5A", b"\x1bx", KEY_HOME]
+        )
+
+    def test_get_input_lone_esc_prefix(self):
+        # Only the ESC leaf of the trie matches; the whole sequence must still be kept together
+        self.assertEqual(self.get_inputs(b"\x1b[2~\x1b"), [b"\x1b[2~", KEY_ESC])
+
+    def test_inside(self):
+        widget = Widget()
+        widget.w, widget.h = 3, 2
+        widget.set_xy(1, 1)
+        self.assertTrue(widget.inside(1, 1))
+        self.assertTrue(widget.inside(3, 2))
+        self.assertFalse(widget.inside(4, 2))
+        self.assertFalse(widget.inside(3, 3))
+        widget.set_xy(5, 5)
+        self.assertFalse(widget.inside(1, 1))
+        self.assertTrue(widget.inside(5, 5))
+
+    def test_inside_without_widget_init(self):
+        label = WLabel("abc")
+        label.x, label.y = 2, 0
+        self.assertTrue(label.inside(4, 0))
+        self.assertFalse(label.inside(5, 0))
+
+    def test_get_input_key_split_across_reads(self):
+        widget = Widget()
+        reads = [b"a\xe4", b"\xb8\xad\x1b[1", b"~"]
+        with mock.patch("picotui.basewidget.os.read", side_effect=reads), \
+                mock.patch("picotui.basewidget.select.select", return_value=([0], [], [])):
+            inputs = [widget.get_input() for i in range(3)]
+        self.assertEqual(inputs, [b"a", "\u4e2d".encode(), KEY_HOME])
+
+    def test_inside_after_direct_resize(self):
+        widget = Widget()
+        widget.w, widget.h = 3, 2
+        widget.set_xy(1, 1)
+        self.assertFalse(widget.inside(5, 1))
+        widget.w = 5
+        self.assertTrue(widget.inside(5, 1))